@@ -6,16 +6,65 @@ Aplicación para control de acceso en red SDN basada en roles
 
 import requests
 import json
+import sys
+import time
 import yaml
-from typing import List, Dict, Optional
+from collections import defaultdict
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Optional, Set, FrozenSet, Iterable, Tuple
+
+# orjson es opcional: si no está instalado se usa el módulo json estándar
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    
+    def _json_dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+except ImportError:
+    orjson = None
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    
+    def _json_dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# Usar los bindings de libyaml (C) cuando estén disponibles
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# Tabla para quitar separadores de una MAC en una sola pasada
+_MAC_STRIP = str.maketrans('', '', ':-')
+
+# MAC normalizada del servidor (por ahora fija para el laboratorio)
+_SERVIDOR_MAC_KEY = "fa:16:3e:02:85:a6".upper().translate(_MAC_STRIP)
+
+# Pool compartido para enviar flows al controlador en paralelo
+_flow_pool = ThreadPoolExecutor(max_workers=8)
+
+# Campos constantes de los flows instalados por build_route
+_FLOW_BASE = MappingProxyType({"cookie": "0", "priority": "32768", "active": "true"})
+_ARP_BASE = MappingProxyType({**_FLOW_BASE, "eth_type": "0x0806"})
+_IP_BASE = MappingProxyType({**_FLOW_BASE, "eth_type": "0x0800"})
 
 class Alumno:
     """Clase para representar un alumno en el sistema"""
     
+    __slots__ = ('nombre', 'codigo', 'mac', 'mac_key')
+    
     def __init__(self, nombre: str, codigo: str, mac: str):
         self.nombre = nombre
-        self.codigo = codigo
+        self.codigo = sys.intern(str(codigo))  # El YAML puede traer el código como entero
         self.mac = mac.upper()  # Normalizar MAC a mayúsculas
+        self.mac_key = self.mac.translate(_MAC_STRIP)  # MAC sin separadores para búsquedas
     
     def __str__(self):
         return f"Alumno: {self.nombre} ({self.codigo}) - MAC: {self.mac}"
@@ -30,8 +79,10 @@ class Alumno:
 class Servicio:
     """Clase para representar un servicio en un servidor"""
     
+    __slots__ = ('nombre', 'protocolo', 'puerto')
+    
     def __init__(self, nombre: str, protocolo: str, puerto: int):
-        self.nombre = nombre
+        self.nombre = sys.intern(str(nombre))
         self.protocolo = protocolo.upper()
         self.puerto = puerto
     
@@ -48,19 +99,20 @@ class Servicio:
 class Servidor:
     """Clase para representar un servidor y sus servicios"""
     
+    __slots__ = ('nombre', 'ip', 'servicios', '_servicios_by_name')
+    
     def __init__(self, nombre: str, ip: str):
-        self.nombre = nombre
+        self.nombre = sys.intern(str(nombre))
         self.ip = ip
         self.servicios: List[Servicio] = []
+        self._servicios_by_name: Dict[str, Servicio] = {}  # nombre -> Servicio
     
     def agregar_servicio(self, servicio: Servicio):
         self.servicios.append(servicio)
+        self._servicios_by_name.setdefault(servicio.nombre, servicio)
     
     def obtener_servicio(self, nombre_servicio: str) -> Optional[Servicio]:
-        for servicio in self.servicios:
-            if servicio.nombre == nombre_servicio:
-                return servicio
-        return None
+        return self._servicios_by_name.get(nombre_servicio)
     
     def __str__(self):
         return f"Servidor: {self.nombre} ({self.ip}) - {len(self.servicios)} servicios"
@@ -75,45 +127,68 @@ class Servidor:
 class ServidorPermitido:
     """Clase para representar un servidor permitido en un curso con servicios específicos"""
     
-    def __init__(self, nombre: str, servicios_permitidos: List[str]):
-        self.nombre = nombre
-        self.servicios_permitidos = servicios_permitidos
+    __slots__ = ('nombre', 'servicios_permitidos')
+    
+    def __init__(self, nombre: str, servicios_permitidos: Iterable[str]):
+        self.nombre = sys.intern(str(nombre))
+        self.servicios_permitidos: FrozenSet[str] = frozenset(sys.intern(str(s)) for s in servicios_permitidos)
     
     def to_dict(self):
         return {
             'nombre': self.nombre,
-            'servicios_permitidos': self.servicios_permitidos
+            'servicios_permitidos': sorted(self.servicios_permitidos)
         }
 
 class Curso:
     """Clase para representar un curso con alumnos y servidores permitidos"""
     
+    __slots__ = ('codigo', 'nombre', '_estado', '_is_active', 'alumnos', 'servidores')
+    
     def __init__(self, codigo: str, nombre: str, estado: str = "INACTIVO"):
         self.codigo = codigo
         self.nombre = nombre
-        self.estado = estado.upper()
-        self.alumnos: List[str] = []  # Lista de códigos de alumnos
+        self.cambiar_estado(estado)
+        self.alumnos: Set[str] = set()  # Conjunto de códigos de alumnos
         self.servidores: List[ServidorPermitido] = []
     
+    @property
+    def estado(self) -> str:
+        return self._estado
+    
+    def cambiar_estado(self, estado: str):
+        """
+        Cambia el estado del curso. Para un curso ya registrado usar
+        SDNApplication.actualizar_estado_curso, que además actualiza el índice de autorización
+        """
+        self._estado = estado.upper()
+        self._is_active = self._estado == "DICTANDO"  # Se recalcula solo al cambiar el estado
+    
+    @property
+    def activo(self) -> bool:
+        """Indica si el curso está DICTANDO"""
+        return self._is_active
+    
     def agregar_alumno(self, codigo_alumno: str):
-        if codigo_alumno not in self.alumnos:
-            self.alumnos.append(codigo_alumno)
+        self.alumnos.add(sys.intern(str(codigo_alumno)))
     
     def remover_alumno(self, codigo_alumno: str):
-        if codigo_alumno in self.alumnos:
-            self.alumnos.remove(codigo_alumno)
+        self.alumnos.discard(str(codigo_alumno))
     
     def agregar_servidor(self, servidor_permitido: ServidorPermitido):
         self.servidores.append(servidor_permitido)
     
     def alumno_tiene_acceso_servicio(self, codigo_alumno: str, nombre_servidor: str, nombre_servicio: str) -> bool:
-        """Verifica si un alumno tiene acceso a un servicio específico de un servidor"""
-        # Verificar que el alumno esté en el curso
-        if codigo_alumno not in self.alumnos:
+        """
+        Verifica si un alumno tiene acceso a un servicio específico de un servidor
+        considerando solo este curso. La autorización de conexiones usa el índice
+        de SDNApplication (verificar_autorizacion), que es la fuente de verdad
+        """
+        # Verificar que el curso esté activo (descarte más barato primero)
+        if not self._is_active:
             return False
         
-        # Verificar que el curso esté activo
-        if self.estado != "DICTANDO":
+        # Verificar que el alumno esté en el curso
+        if codigo_alumno not in self.alumnos:
             return False
         
         # Buscar el servidor en la lista de servidores permitidos
@@ -131,19 +206,25 @@ class Curso:
             'codigo': self.codigo,
             'nombre': self.nombre,
             'estado': self.estado,
-            'alumnos': self.alumnos,
+            'alumnos': sorted(self.alumnos),
             'servidores': [s.to_dict() for s in self.servidores]
         }
 
 class Conexion:
     """Clase para representar una conexión activa entre alumno y servicio"""
     
-    def __init__(self, handler: str, codigo_alumno: str, nombre_servidor: str, nombre_servicio: str):
+    __slots__ = ('handler', 'codigo_alumno', 'nombre_servidor', 'nombre_servicio', 'activa', 'dpid', 'port')
+    
+    def __init__(self, handler: str, codigo_alumno: str, nombre_servidor: str, nombre_servicio: str,
+                 dpid: str, port: int):
         self.handler = handler
         self.codigo_alumno = codigo_alumno
         self.nombre_servidor = nombre_servidor
         self.nombre_servicio = nombre_servicio
         self.activa = True
+        # Punto de conexión del alumno donde se instalaron los flows
+        self.dpid = dpid
+        self.port = port
     
     def __str__(self):
         estado = "ACTIVA" if self.activa else "INACTIVA"
@@ -156,17 +237,33 @@ class Conexion:
 class FloodlightController:
     """Clase para manejar la comunicación con el controlador Floodlight"""
     
-    def __init__(self, controller_ip: str = "127.0.0.1", controller_port: int = 8080):
+    def __init__(self, controller_ip: str = "127.0.0.1", controller_port: int = 8080,
+                 devices_ttl: float = 3.0, devices_miss_interval: float = 1.0,
+                 route_ttl: float = 30.0):
         self.base_url = f"http://{controller_ip}:{controller_port}"
         self.session = requests.Session()
+        # Pool de conexiones persistentes, dimensionado para los envíos paralelos de flows
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                              max_retries=Retry(total=3, backoff_factor=0.1,
+                                                status_forcelist=[502, 503, 504]))
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        self._json_headers = {"Content-Type": "application/json"}
+        self.devices_ttl = devices_ttl
+        self.devices_miss_interval = devices_miss_interval  # Mínimo entre refrescos por MAC no encontrada
+        self._devices_cache: Dict[str, Tuple[str, int]] = {}  # MAC normalizada -> (dpid, puerto)
+        self._devices_ts = 0.0
+        self.route_ttl = route_ttl
+        self._route_cache: Dict[Tuple[str, str], Tuple[float, List[Dict]]] = {}  # (src, dst) -> (instante, ruta)
+        self._links_fingerprint: Optional[int] = None
     
     def get_switches(self) -> List[Dict]:
         """Obtiene la lista de switches conectados al controlador"""
         try:
             response = self.session.get(f"{self.base_url}/wm/core/controller/switches/json")
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Error obteniendo switches: {e}")
             return []
     
@@ -175,32 +272,78 @@ class FloodlightController:
         try:
             response = self.session.get(f"{self.base_url}/wm/device/")
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Error obteniendo dispositivos: {e}")
             return []
     
+    def get_devices_slim(self) -> List[Tuple[str, str, int]]:
+        """Obtiene solo (mac, dpid, puerto) de los dispositivos con punto de conexión"""
+        return [
+            (d['mac'][0], d['attachmentPoint'][0]['switchDPID'], d['attachmentPoint'][0]['port'])
+            for d in self.get_devices() if d.get('mac') and d.get('attachmentPoint')
+        ]
+    
+    def get_device_location(self, mac_key: str) -> Optional[Tuple[str, int]]:
+        """
+        Busca (dpid, puerto) por MAC normalizada. La caché se refresca si expiró, o si no
+        contiene la MAC y pasaron al menos devices_miss_interval segundos desde el último refresco
+        """
+        location = self._devices_cache.get(mac_key)
+        edad = time.monotonic() - self._devices_ts
+        if edad > self.devices_ttl or (location is None and edad > self.devices_miss_interval):
+            self._devices_cache = {
+                mac.translate(_MAC_STRIP).upper(): (dpid, port)
+                for mac, dpid, port in self.get_devices_slim()
+            }
+            self._devices_ts = time.monotonic()
+            location = self._devices_cache.get(mac_key)
+        return location
+    
     def get_topology_links(self) -> List[Dict]:
         """Obtiene los enlaces de la topología"""
         try:
             response = self.session.get(f"{self.base_url}/wm/topology/links/json")
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            fingerprint = hash(response.content)
+            if fingerprint != self._links_fingerprint:
+                # La topología cambió: las rutas guardadas ya no son válidas
+                self._route_cache.clear()
+                self._links_fingerprint = fingerprint
+            return _json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Error obteniendo topología: {e}")
             return []
     
+    def get_route_cached(self, src_dpid: str, dst_dpid: str) -> List[Dict]:
+        """Retorna la ruta entre dos switches, reutilizando la calculada hace menos de route_ttl segundos"""
+        key = (src_dpid, dst_dpid)
+        now = time.monotonic()
+        cached = self._route_cache.get(key)
+        if cached is not None and now - cached[0] <= self.route_ttl:
+            return cached[1]
+        
+        route = get_route(self, src_dpid, dst_dpid)
+        if route:  # No guardar errores ni rutas vacías
+            self._route_cache[key] = (now, route)
+        return route
+    
     def push_flow(self, dpid: str, flow_entry: Dict) -> bool:
         """Instala un flow entry en un switch específico"""
         try:
             url = f"{self.base_url}/wm/staticflowentrypusher/insert/json"
-            response = self.session.post(url, json=flow_entry)
+            response = self.session.post(url, data=_json_dumps(flow_entry), headers=self._json_headers)
             response.raise_for_status()
             return True
         except requests.exceptions.RequestException as e:
             print(f"Error instalando flow en switch {dpid}: {e}")
             return False
     
+    def push_flows_bulk(self, flow_entries: List[Dict]) -> bool:
+        """Instala varios flow entries en paralelo; retorna True solo si todos se instalaron"""
+        futures = [_flow_pool.submit(self.push_flow, entry['switch'], entry) for entry in flow_entries]
+        return all([f.result() for f in futures])
+    
     def delete_flow(self, dpid: str, flow_name: str) -> bool:
         """Elimina un flow entry de un switch específico"""
         try:
@@ -209,31 +352,30 @@ class FloodlightController:
                 "switch": dpid,
                 "name": flow_name
             }
-            response = self.session.delete(url, json=delete_entry)
+            response = self.session.delete(url, data=_json_dumps(delete_entry), headers=self._json_headers)
             response.raise_for_status()
             return True
         except requests.exceptions.RequestException as e:
             print(f"Error eliminando flow {flow_name} del switch {dpid}: {e}")
             return False
+    
+    def delete_flows_bulk(self, dpid: str, flow_names: List[str]) -> bool:
+        """Elimina varios flow entries de un switch en paralelo; retorna True solo si todos se eliminaron"""
+        futures = [_flow_pool.submit(self.delete_flow, dpid, name) for name in flow_names]
+        return all([f.result() for f in futures])
 
-def get_attachment_point(controller: FloodlightController, mac_address: str) -> Optional[Dict]:
+def get_attachment_point(controller: FloodlightController, mac_key: str) -> Optional[Dict]:
     """
     Encuentra el punto de conexión (switch y puerto) de un dispositivo por su MAC
+    normalizada (mayúsculas y sin separadores, como Alumno.mac_key)
     """
-    devices = controller.get_devices()
-    
-    mac_normalized = mac_address.replace(":", "").replace("-", "").upper()
-    
-    for device in devices:
-        if 'mac' in device:
-            device_mac = device['mac'][0].replace(":", "").replace("-", "").upper()
-            if device_mac == mac_normalized:
-                if 'attachmentPoint' in device and device['attachmentPoint']:
-                    ap = device['attachmentPoint'][0]
-                    return {
-                        'dpid': ap['switchDPID'],
-                        'port': ap['port']
-                    }
+    location = controller.get_device_location(mac_key)
+    if location:
+        dpid, port = location
+        return {
+            'dpid': dpid,
+            'port': port
+        }
     return None
 
 def get_route(controller: FloodlightController, src_dpid: str, dst_dpid: str) -> List[Dict]:
@@ -244,26 +386,28 @@ def get_route(controller: FloodlightController, src_dpid: str, dst_dpid: str) ->
         url = f"{controller.base_url}/wm/topology/route/{src_dpid}/{dst_dpid}/json"
         response = controller.session.get(url)
         response.raise_for_status()
-        route_data = response.json()
+        route_data = _json_loads(response.content)
         
         if route_data and len(route_data) > 0:
             return route_data[0]['path'] if 'path' in route_data[0] else []
         return []
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error calculando ruta entre {src_dpid} y {dst_dpid}: {e}")
         return []
 
 def build_route(controller: FloodlightController, alumno: Alumno, servidor: Servidor, 
-                servicio: Servicio, handler: str) -> bool:
+                servicio: Servicio, handler: str, src_ap: Optional[Dict] = None) -> bool:
     """
     Construye e instala los flows necesarios para habilitar la conectividad
-    entre un alumno y un servicio específico del servidor
+    entre un alumno y un servicio específico del servidor.
+    Si no se indica src_ap, se consulta el punto de conexión del alumno al controlador
     """
     print(f"Construyendo ruta para {handler}: {alumno.codigo} -> {servidor.nombre}:{servicio.nombre}")
     
     # 1. Encontrar puntos de conexión
-    src_ap = get_attachment_point(controller, alumno.mac)
-    dst_ap = get_attachment_point(controller, "fa:16:3e:02:85:a6")  # Necesitaremos la MAC del servidor
+    if src_ap is None:
+        src_ap = get_attachment_point(controller, alumno.mac_key)
+    dst_ap = get_attachment_point(controller, _SERVIDOR_MAC_KEY)  # Necesitaremos la MAC del servidor
     
     if not src_ap:
         print(f"Error: No se pudo encontrar el punto de conexión para {alumno.mac}")
@@ -277,87 +421,69 @@ def build_route(controller: FloodlightController, alumno: Alumno, servidor: Serv
         # Mismo switch, solo necesitamos flows en un switch
         route = [{'switch': src_ap['dpid'], 'port': src_ap['port']}]
     else:
-        route = get_route(controller, src_ap['dpid'], dst_ap['dpid'] if dst_ap else src_ap['dpid'])
+        route = controller.get_route_cached(src_ap['dpid'], dst_ap['dpid'] if dst_ap else src_ap['dpid'])
     
     # 3. Instalar flows para el tráfico del alumno al servidor
-    success = True
+    
+    # Campos de capa 4 comunes a los flows outbound e inbound
+    is_tcp = servicio.protocolo == "TCP"
+    ip_proto = "6" if is_tcp else "17"
+    port_key_out = "tcp_dst" if is_tcp else "udp_dst"
+    port_key_in = "tcp_src" if is_tcp else "udp_src"
+    port_val = str(servicio.puerto)
+    
+    dpid = src_ap['dpid']
+    in_port = str(src_ap['port'])
+    output_alumno = f"output={src_ap['port']}"
     
     # Flow para ARP requests (necesario para resolución de direcciones)
     arp_flow = {
-        "switch": src_ap['dpid'],
+        **_ARP_BASE,
+        "switch": dpid,
         "name": f"{handler}_arp_request",
-        "cookie": "0",
-        "priority": "32768",
-        "in_port": str(src_ap['port']),
-        "eth_type": "0x0806",
+        "in_port": in_port,
         "arp_tpa": servidor.ip,
-        "active": "true",
         "actions": "output=flood"
     }
     
-    if not controller.push_flow(src_ap['dpid'], arp_flow):
-        success = False
-    
     # Flow para ARP replies
     arp_reply_flow = {
-        "switch": src_ap['dpid'],
+        **_ARP_BASE,
+        "switch": dpid,
         "name": f"{handler}_arp_reply",
-        "cookie": "0",
-        "priority": "32768",
-        "eth_type": "0x0806",
         "arp_spa": servidor.ip,
         "arp_tha": alumno.mac,
-        "active": "true",
-        "actions": f"output={src_ap['port']}"
+        "actions": output_alumno
     }
     
-    if not controller.push_flow(src_ap['dpid'], arp_reply_flow):
-        success = False
-    
     # Flow para tráfico del alumno al servidor (outbound)
     outbound_flow = {
-        "switch": src_ap['dpid'],
+        **_IP_BASE,
+        "switch": dpid,
         "name": f"{handler}_outbound",
-        "cookie": "0",
-        "priority": "32768",
-        "in_port": str(src_ap['port']),
+        "in_port": in_port,
         "eth_src": alumno.mac,
-        "eth_type": "0x0800",
         "ipv4_dst": servidor.ip,
-        "ip_proto": "6" if servicio.protocolo == "TCP" else "17",
-        "tcp_dst": str(servicio.puerto) if servicio.protocolo == "TCP" else "",
-        "udp_dst": str(servicio.puerto) if servicio.protocolo == "UDP" else "",
-        "active": "true",
+        "ip_proto": ip_proto,
+        port_key_out: port_val,
         "actions": "output=flood"  # En un entorno real, sería el puerto específico
     }
     
-    # Limpiar campos vacíos
-    outbound_flow = {k: v for k, v in outbound_flow.items() if v != ""}
-    
-    if not controller.push_flow(src_ap['dpid'], outbound_flow):
-        success = False
-    
     # Flow para tráfico del servidor al alumno (inbound)
     inbound_flow = {
-        "switch": src_ap['dpid'],
+        **_IP_BASE,
+        "switch": dpid,
         "name": f"{handler}_inbound",
-        "cookie": "0",
-        "priority": "32768",
         "eth_dst": alumno.mac,
-        "eth_type": "0x0800",
         "ipv4_src": servidor.ip,
-        "ip_proto": "6" if servicio.protocolo == "TCP" else "17",
-        "tcp_src": str(servicio.puerto) if servicio.protocolo == "TCP" else "",
-        "udp_src": str(servicio.puerto) if servicio.protocolo == "UDP" else "",
-        "active": "true",
-        "actions": f"output={src_ap['port']}"
+        "ip_proto": ip_proto,
+        port_key_in: port_val,
+        "actions": output_alumno
     }
     
-    # Limpiar campos vacíos
-    inbound_flow = {k: v for k, v in inbound_flow.items() if v != ""}
-    
-    if not controller.push_flow(src_ap['dpid'], inbound_flow):
-        success = False
+    # Instalar todos los flows en paralelo
+    flows = [arp_flow, arp_reply_flow, outbound_flow, inbound_flow]
+    success = controller.push_flows_bulk(flows)
     
     if success:
         print(f"Ruta creada exitosamente para {handler}")
@@ -379,13 +505,22 @@ class SDNApplication:
         self.cursos: Dict[str, Curso] = {}    # código -> Curso
         self.servidores: Dict[str, Servidor] = {}  # nombre -> Servidor
         self.conexiones: Dict[str, Conexion] = {}  # handler -> Conexion
+        self._conexiones_by_alumno: Dict[str, Set[str]] = defaultdict(set)  # código -> handlers
         self.connection_counter = 1
+        self._alumno_to_cursos: Dict[str, Set[str]] = defaultdict(set)  # código alumno -> códigos de curso
+        self._acl_index: Dict[str, Set[Tuple[str, str]]] = {}  # código alumno -> (servidor, servicio) autorizados
+        # (servidor, servicio) -> códigos de curso; dict como conjunto ordenado para conservar el orden de self.cursos
+        self._policy_index: Dict[Tuple[str, str], Dict[str, None]] = defaultdict(dict)
     
     def importar_datos(self, archivo_yaml: str) -> bool:
-        """Importa datos desde un archivo YAML"""
+        """Importa datos desde un archivo YAML (o JSON si la extensión es .json)"""
         try:
-            with open(archivo_yaml, 'r', encoding='utf-8') as file:
-                data = yaml.safe_load(file)
+            if archivo_yaml.lower().endswith('.json'):
+                with open(archivo_yaml, 'rb') as file:
+                    data = _json_loads(file.read())
+            else:
+                with open(archivo_yaml, 'r', encoding='utf-8') as file:
+                    data = yaml.load(file, Loader=_YamlLoader)
             
             # Importar alumnos
             if 'alumnos' in data:
@@ -443,18 +578,34 @@ class SDNApplication:
         except Exception as e:
             print(f"Error importando datos: {e}")
             return False
+        
+        finally:
+            # Una importación parcial deja cursos en self.cursos: los índices deben reflejarlos igual
+            self._rebuild_acl_index()
+            self._rebuild_policy_index()
+    
+    def _datos_dict(self) -> Dict:
+        """Arma la representación serializable de alumnos, servidores y cursos"""
+        return {
+            'alumnos': [alumno.to_dict() for alumno in self.alumnos.values()],
+            'servidores': [servidor.to_dict() for servidor in self.servidores.values()],
+            'cursos': [curso.to_dict() for curso in self.cursos.values()]
+        }
     
     def exportar_datos(self, archivo_yaml: str) -> bool:
-        """Exporta datos a un archivo YAML"""
+        """
+        Exporta datos a un archivo YAML (o JSON si la extensión es .json).
+        Es un punto de guardado explícito: las operaciones del sistema solo
+        modifican el estado en memoria y nunca llaman a este método
+        """
+        if archivo_yaml.lower().endswith('.json'):
+            return self.exportar_datos_json(archivo_yaml)
         try:
-            data = {
-                'alumnos': [alumno.to_dict() for alumno in self.alumnos.values()],
-                'servidores': [servidor.to_dict() for servidor in self.servidores.values()],
-                'cursos': [curso.to_dict() for curso in self.cursos.values()]
-            }
+            data = self._datos_dict()
             
             with open(archivo_yaml, 'w', encoding='utf-8') as file:
-                yaml.dump(data, file, default_flow_style=False, allow_unicode=True)
+                yaml.dump(data, file, Dumper=_YamlDumper, default_flow_style=False,
+                          allow_unicode=True, sort_keys=False)
             
             print(f"Datos exportados exitosamente a {archivo_yaml}")
             return True
@@ -463,16 +614,113 @@ class SDNApplication:
             print(f"Error exportando datos: {e}")
             return False
     
+    def exportar_datos_json(self, archivo_json: str) -> bool:
+        """Exporta datos a un archivo JSON, más rápido que YAML para inventarios grandes"""
+        try:
+            data = self._datos_dict()
+            
+            with open(archivo_json, 'wb') as file:
+                file.write(_json_dumps_pretty(data))
+            
+            print(f"Datos exportados exitosamente a {archivo_json}")
+            return True
+            
+        except Exception as e:
+            print(f"Error exportando datos: {e}")
+            return False
+    
+    def _rebuild_acl_index(self):
+        """Reconstruye el índice inverso alumno -> cursos y el índice de accesos autorizados"""
+        self._alumno_to_cursos = defaultdict(set)
+        for curso in self.cursos.values():
+            for codigo_alumno in curso.alumnos:
+                self._alumno_to_cursos[codigo_alumno].add(curso.codigo)
+        
+        self._acl_index = {}
+        for codigo_alumno in self._alumno_to_cursos:
+            self._rebuild_acl_alumno(codigo_alumno)
+    
+    def _rebuild_acl_alumno(self, codigo_alumno: str):
+        """Recalcula los accesos de un alumno revisando solo los cursos en los que está matriculado"""
+        accesos: Set[Tuple[str, str]] = set()
+        for codigo_curso in self._alumno_to_cursos.get(codigo_alumno, ()):
+            curso = self.cursos[codigo_curso]
+            if curso.activo:
+                for servidor in curso.servidores:
+                    accesos.update((servidor.nombre, s) for s in servidor.servicios_permitidos)
+        
+        if accesos:
+            self._acl_index[codigo_alumno] = accesos
+        else:
+            self._acl_index.pop(codigo_alumno, None)
+    
+    def _rebuild_policy_index(self):
+        """Reconstruye el índice (servidor, servicio) -> cursos que lo permiten"""
+        self._policy_index = defaultdict(dict)
+        for curso in self.cursos.values():
+            self._indexar_politicas_curso(curso)
+    
+    def _indexar_politicas_curso(self, curso: Curso):
+        """Agrega al índice de políticas los servicios permitidos por un curso"""
+        for servidor in curso.servidores:
+            for nombre_servicio in servidor.servicios_permitidos:
+                self._policy_index[(servidor.nombre, nombre_servicio)][curso.codigo] = None
+    
+    def cursos_con_acceso(self, nombre_servidor: str, nombre_servicio: str) -> List[Curso]:
+        """Retorna los cursos DICTANDO que permiten un servicio de un servidor, en el orden de registro"""
+        codigos = self._policy_index.get((nombre_servidor, nombre_servicio), ())
+        return [self.cursos[codigo] for codigo in codigos if self.cursos[codigo].activo]
+    
+    def agregar_curso(self, curso: Curso) -> bool:
+        """
+        Registra un curso y actualiza los índices de autorización y de políticas.
+        Retorna False si ya existe un curso con ese código
+        """
+        if self.cursos.setdefault(curso.codigo, curso) is not curso:
+            return False
+        for codigo_alumno in curso.alumnos:
+            self._alumno_to_cursos[codigo_alumno].add(curso.codigo)
+            self._rebuild_acl_alumno(codigo_alumno)
+        self._indexar_politicas_curso(curso)
+        return True
+    
+    def agregar_alumno_curso(self, codigo_curso: str, codigo_alumno: str):
+        """Matricula un alumno en un curso y actualiza sus accesos autorizados"""
+        codigo_alumno = sys.intern(str(codigo_alumno))
+        self.cursos[codigo_curso].agregar_alumno(codigo_alumno)
+        self._alumno_to_cursos[codigo_alumno].add(codigo_curso)
+        self._rebuild_acl_alumno(codigo_alumno)
+    
+    def remover_alumno_curso(self, codigo_curso: str, codigo_alumno: str):
+        """Retira un alumno de un curso y actualiza sus accesos autorizados"""
+        codigo_alumno = str(codigo_alumno)
+        self.cursos[codigo_curso].remover_alumno(codigo_alumno)
+        cursos = self._alumno_to_cursos.get(codigo_alumno)
+        if cursos is not None:
+            cursos.discard(codigo_curso)
+            if not cursos:
+                del self._alumno_to_cursos[codigo_alumno]
+        self._rebuild_acl_alumno(codigo_alumno)
+    
+    def actualizar_estado_curso(self, codigo_curso: str, estado: str):
+        """Cambia el estado de un curso y actualiza los accesos de sus alumnos"""
+        curso = self.cursos[codigo_curso]
+        curso.cambiar_estado(estado)
+        for codigo_alumno in curso.alumnos:
+            self._rebuild_acl_alumno(codigo_alumno)
+    
     def verificar_autorizacion(self, codigo_alumno: str, nombre_servidor: str, nombre_servicio: str) -> bool:
         """Verifica si un alumno está autorizado para acceder a un servicio"""
-        for curso in self.cursos.values():
-            if curso.alumno_tiene_acceso_servicio(codigo_alumno, nombre_servidor, nombre_servicio):
-                return True
-        return False
+        return (nombre_servidor, nombre_servicio) in self._acl_index.get(codigo_alumno, ())
     
     def crear_conexion(self, codigo_alumno: str, nombre_servidor: str, nombre_servicio: str) -> Optional[str]:
         """Crea una conexión entre un alumno y un servicio"""
         
+        # Internar las claves para que las búsquedas en los índices comparen por identidad
+        codigo_alumno = sys.intern(str(codigo_alumno))
+        nombre_servidor = sys.intern(str(nombre_servidor))
+        nombre_servicio = sys.intern(str(nombre_servicio))
+        
         # Verificar que el alumno existe
         if codigo_alumno not in self.alumnos:
             print(f"Error: Alumno {codigo_alumno} no encontrado")
@@ -499,12 +747,20 @@ class SDNApplication:
         handler = f"conn_{self.connection_counter:04d}"
         self.connection_counter += 1
         
-        # Crear la ruta en el controlador
+        # Encontrar el punto de conexión del alumno (se reutiliza al eliminar la conexión)
         alumno = self.alumnos[codigo_alumno]
-        if build_route(self.controller, alumno, servidor, servicio, handler):
+        src_ap = get_attachment_point(self.controller, alumno.mac_key)
+        if not src_ap:
+            print(f"Error: No se pudo encontrar el punto de conexión para {alumno.mac}")
+            return None
+        
+        # Crear la ruta en el controlador
+        if build_route(self.controller, alumno, servidor, servicio, handler, src_ap):
             # Crear objeto conexión
-            conexion = Conexion(handler, codigo_alumno, nombre_servidor, nombre_servicio)
+            conexion = Conexion(handler, codigo_alumno, nombre_servidor, nombre_servicio,
+                                src_ap['dpid'], src_ap['port'])
             self.conexiones[handler] = conexion
+            self._conexiones_by_alumno[codigo_alumno].add(handler)
             print(f"Conexión creada exitosamente: {handler}")
             return handler
         else:
@@ -518,18 +774,23 @@ class SDNApplication:
             return False
         
         conexion = self.conexiones[handler]
-        alumno = self.alumnos[conexion.codigo_alumno]
         
-        # Encontrar el switch donde está conectado el alumno
-        attachment_point = get_attachment_point(self.controller, alumno.mac)
-        if attachment_point:
-            if delete_route(self.controller, handler, attachment_point['dpid']):
-                del self.conexiones[handler]
-                print(f"Conexión {handler} eliminada exitosamente")
-                return True
+        # Los flows se instalaron en el switch guardado al crear la conexión
+        if delete_route(self.controller, handler, conexion.dpid):
+            del self.conexiones[handler]
+            handlers = self._conexiones_by_alumno[conexion.codigo_alumno]
+            handlers.discard(handler)
+            if not handlers:
+                del self._conexiones_by_alumno[conexion.codigo_alumno]
+            print(f"Conexión {handler} eliminada exitosamente")
+            return True
         
         print(f"Error eliminando la conexión {handler}")
         return False
+    
+    def listar_conexiones_alumno(self, codigo_alumno: str) -> Set[str]:
+        """Retorna los handlers de las conexiones activas de un alumno"""
+        return set(self._conexiones_by_alumno.get(codigo_alumno, ()))
 
 def delete_route(controller: FloodlightController, handler: str, dpid: str) -> bool:
     """
@@ -542,60 +803,349 @@ def delete_route(controller: FloodlightController, handler: str, dpid: str) -> b
         f"{handler}_inbound"
     ]
     
-    success = True
-    for flow_name in flows_to_delete:
-        if not controller.delete_flow(dpid, flow_name):
-            success = False
-    
-    return success
+    return controller.delete_flows_bulk(dpid, flows_to_delete)
 
 
 # ============================================================================
 # INTERFAZ DE USUARIO - MENÚS INTERACTIVOS
 # ============================================================================
 
+SEP = "=" * 50
+
+# Menús armados una sola vez; cada redibujado es una única escritura a stdout
+MENU_PRINCIPAL = "\n".join([
+    "",
+    SEP,
+    "     SISTEMA SDN - CONTROL DE ACCESO",
+    SEP,
+    "1) Importar",
+    "2) Exportar",
+    "3) Cursos",
+    "4) Alumnos",
+    "5) Servidores",
+    "6) Políticas",
+    "7) Conexiones",
+    "0) Salir",
+    SEP,
+    "",
+])
+
+MENU_CURSOS = "\n".join([
+    "",
+    "--- GESTIÓN DE CURSOS ---",
+    "1) Crear curso",
+    "2) Listar cursos",
+    "3) Mostrar detalle",
+    "4) Actualizar curso",
+    "5) Borrar curso",
+    "0) Volver",
+    "",
+])
+
+MENU_ACTUALIZAR_CURSO = "\n".join([
+    "",
+    "Opciones:",
+    "1) Agregar alumno al curso",
+    "2) Eliminar alumno del curso",
+    "0) Cancelar",
+    "",
+])
+
+MENU_ALUMNOS = "\n".join([
+    "",
+    "--- GESTIÓN DE ALUMNOS ---",
+    "1) Crear alumno",
+    "2) Listar alumnos",
+    "3) Mostrar detalle",
+    "4) Actualizar alumno",
+    "5) Borrar alumno",
+    "0) Volver",
+    "",
+])
+
+MENU_SERVIDORES = "\n".join([
+    "",
+    "--- GESTIÓN DE SERVIDORES ---",
+    "1) Crear servidor",
+    "2) Listar servidores",
+    "3) Mostrar detalle de un servidor",
+    "0) Volver",
+    "",
+])
+
+MENU_CONEXIONES = "\n".join([
+    "",
+    "--- GESTIÓN DE CONEXIONES ---",
+    "1) Crear conexión",
+    "2) Listar conexiones",
+    "3) Eliminar conexión",
+    "0) Volver",
+    "",
+])
+
+def read_fields(prompt: str, n: int) -> Optional[List[str]]:
+    """
+    Lee n campos separados por comas en una sola línea. El último campo puede
+    contener comas. Retorna None si la cantidad de campos no coincide
+    """
+    campos = [campo.strip() for campo in input(prompt).split(",", n - 1)]
+    if len(campos) != n:
+        print(f"❌ Se esperaban {n} campos separados por comas.")
+        return None
+    return campos
+
 def menu_principal():
     """Muestra el menú principal"""
-    print("\n" + "="*50)
-    print("     SISTEMA SDN - CONTROL DE ACCESO")
-    print("="*50)
-    print("1) Importar")
-    print("2) Exportar") 
-    print("3) Cursos")
-    print("4) Alumnos")
-    print("5) Servidores")
-    print("6) Políticas")
-    print("7) Conexiones")
-    print("0) Salir")
-    print("="*50)
+    sys.stdout.write(MENU_PRINCIPAL)
 
 def menu_cursos():
     """Menú para gestión de cursos"""
-    print("\n--- GESTIÓN DE CURSOS ---")
-    print("1) Crear curso")
-    print("2) Listar cursos")
-    print("3) Mostrar detalle")
-    print("4) Actualizar curso")
-    print("5) Borrar curso")
-    print("0) Volver")
+    sys.stdout.write(MENU_CURSOS)
 
 def menu_alumnos():
-    """Menú para gestión de alumnos""" 
-    print("\n--- GESTIÓN DE ALUMNOS ---")
-    print("1) Crear alumno")
-    print("2) Listar alumnos")
-    print("3) Mostrar detalle")
-    print("4) Actualizar alumno")
-    print("5) Borrar alumno")
-    print("0) Volver")
+    """Menú para gestión de alumnos"""
+    sys.stdout.write(MENU_ALUMNOS)
 
 def menu_servidores():
     """Menú para gestión de servidores"""
-    print("\n--- GESTIÓN DE SERVIDORES ---")
-    print("1) Crear servidor")
-    print("2) Listar servidores")
-    print("3) Mostrar detalle de un servidor")
-    print("0) Volver")
+    sys.stdout.write(MENU_SERVIDORES)
+
+def menu_conexiones():
+    """Menú para gestión de conexiones"""
+    sys.stdout.write(MENU_CONEXIONES)
+
+
+def run_submenu(app: SDNApplication, mostrar_menu, acciones: Dict) -> None:
+    """Ejecuta un submenú hasta que se elija 0, despachando cada opción con su tabla de acciones"""
+    while True:
+        mostrar_menu()
+        subop = input("Seleccione una opción: ")
+        if subop == "0":
+            break
+        acciones.get(subop, handle_invalid_sub)(app)
+
+def handle_invalid_sub(app: SDNApplication) -> None:
+    print("Opción inválida.")
+
+# ----------------------------------------------------------------------------
+# Cursos
+# ----------------------------------------------------------------------------
+
+def curso_crear(app: SDNApplication) -> None:
+    campos = read_fields("Código, estado (DICTANDO o INACTIVO), nombre del curso: ", 3)
+    if campos is None:
+        return
+    codigo, estado, nombre = campos
+    nuevo = Curso(codigo, nombre, estado)
+    if not app.agregar_curso(nuevo):
+        print("⚠️ Ya existe un curso con ese código.")
+    else:
+        print(f"Curso {nombre} agregado con éxito.")
+
+def curso_listar(app: SDNApplication) -> None:
+    print("\nLista de cursos:")
+    for curso in app.cursos.values():
+        print(f" - {curso}")
+
+def curso_detalle(app: SDNApplication) -> None:
+    codigo = input("Ingrese el código del curso: ")
+    if codigo in app.cursos:
+        curso = app.cursos[codigo]
+        print(curso)
+        lineas = ["Alumnos:"]
+        for cod in sorted(curso.alumnos):
+            alumno = app.alumnos.get(cod)
+            lineas.append(f" - {alumno}" if alumno else f" - Código {cod} (no encontrado)")
+        lineas.append("Servidores permitidos:")
+        lineas.extend(f" - {srv.nombre}: {', '.join(sorted(srv.servicios_permitidos))}"
+                      for srv in curso.servidores)
+        print("\n".join(lineas))
+    else:
+        print("❌ Curso no encontrado.")
+
+def curso_agregar_alumno(app: SDNApplication, codigo: str) -> None:
+    codigo_alumno = input("Código del alumno a agregar: ")
+    if codigo_alumno in app.alumnos:
+        app.agregar_alumno_curso(codigo, codigo_alumno)
+        print(f"Alumno {codigo_alumno} agregado al curso {codigo}.")
+    else:
+        print("❌ Alumno no encontrado.")
+
+def curso_eliminar_alumno(app: SDNApplication, codigo: str) -> None:
+    codigo_alumno = input("Código del alumno a eliminar: ")
+    app.remover_alumno_curso(codigo, codigo_alumno)
+    print(f"Alumno {codigo_alumno} eliminado del curso {codigo}.")
+
+def curso_cancelar(app: SDNApplication, codigo: str) -> None:
+    print("Acción cancelada.")
+
+def curso_accion_invalida(app: SDNApplication, codigo: str) -> None:
+    print("Opción inválida.")
+
+ACCIONES_ACTUALIZAR_CURSO = {
+    "1": curso_agregar_alumno,
+    "2": curso_eliminar_alumno,
+    "0": curso_cancelar,
+}
+
+def curso_actualizar(app: SDNApplication) -> None:
+    codigo = input("Código del curso a actualizar: ")
+    if codigo not in app.cursos:
+        print("❌ Curso no encontrado.")
+        return
+
+    sys.stdout.write(MENU_ACTUALIZAR_CURSO)
+    accion = input("Seleccione una opción: ")
+    ACCIONES_ACTUALIZAR_CURSO.get(accion, curso_accion_invalida)(app, codigo)
+
+ACCIONES_CURSOS = {
+    "1": curso_crear,
+    "2": curso_listar,
+    "3": curso_detalle,
+    "4": curso_actualizar,
+}
+
+# ----------------------------------------------------------------------------
+# Alumnos
+# ----------------------------------------------------------------------------
+
+def alumno_crear(app: SDNApplication) -> None:
+    campos = read_fields("Código PUCP, MAC (ej. 00:11:22:33:44:55), nombre del alumno: ", 3)
+    if campos is None:
+        return
+    codigo, mac, nombre = campos
+    nuevo = Alumno(nombre, codigo, mac)
+    if app.alumnos.setdefault(nuevo.codigo, nuevo) is not nuevo:
+        print("⚠️ Ya existe un alumno con ese código.")
+    else:
+        print(f"Alumno {nombre} agregado con éxito.")
+
+def alumno_listar(app: SDNApplication) -> None:
+    print("\nLista de alumnos:")
+    for alumno in app.alumnos.values():
+        print(f" - {alumno}")
+
+def alumno_detalle(app: SDNApplication) -> None:
+    codigo = input("Ingrese el código del alumno: ")
+    if codigo in app.alumnos:
+        print(app.alumnos[codigo])
+    else:
+        print("❌ Alumno no encontrado.")
+
+ACCIONES_ALUMNOS = {
+    "1": alumno_crear,
+    "2": alumno_listar,
+    "3": alumno_detalle,
+}
+
+# ----------------------------------------------------------------------------
+# Servidores
+# ----------------------------------------------------------------------------
+
+def servidor_crear(app: SDNApplication) -> None:
+    campos = read_fields("Dirección IP, nombre del servidor: ", 2)
+    if campos is None:
+        return
+    ip, nombre = campos
+    nuevo = Servidor(nombre, ip)
+    if app.servidores.setdefault(nuevo.nombre, nuevo) is not nuevo:
+        print("⚠️ Ya existe un servidor con ese nombre.")
+    else:
+        print(f"Servidor {nombre} agregado con éxito.")
+
+def servidor_listar(app: SDNApplication) -> None:
+    print("\nLista de servidores:")
+    for servidor in app.servidores.values():
+        print(f" - {servidor}")
+
+def servidor_detalle(app: SDNApplication) -> None:
+    nombre = input("Nombre del servidor: ")
+    if nombre in app.servidores:
+        srv = app.servidores[nombre]
+        print(f"{srv}")
+        print("\n".join(["Servicios:"] + [f" - {s}" for s in srv.servicios]))
+    else:
+        print("❌ Servidor no encontrado.")
+
+ACCIONES_SERVIDORES = {
+    "1": servidor_crear,
+    "2": servidor_listar,
+    "3": servidor_detalle,
+}
+
+# ----------------------------------------------------------------------------
+# Conexiones
+# ----------------------------------------------------------------------------
+
+def conexion_crear(app: SDNApplication) -> None:
+    cod_alumno = input("Código del alumno: ")
+    nombre_srv = input("Nombre del servidor: ")
+    nombre_srv = nombre_srv.strip()
+    nombre_servicio = input("Nombre del servicio (ej. ssh): ")
+    nombre_servicio = nombre_servicio.strip()
+
+    app.crear_conexion(cod_alumno, nombre_srv, nombre_servicio)
+
+def conexion_listar(app: SDNApplication) -> None:
+    for conn in app.conexiones.values():
+        print(conn)
+
+def conexion_eliminar(app: SDNApplication) -> None:
+    handler = input("Ingrese el handler de la conexión a eliminar: ")
+    app.eliminar_conexion(handler)
+
+ACCIONES_CONEXIONES = {
+    "1": conexion_crear,
+    "2": conexion_listar,
+    "3": conexion_eliminar,
+}
+
+# ----------------------------------------------------------------------------
+# Menú principal
+# ----------------------------------------------------------------------------
+
+def handle_import(app: SDNApplication) -> None:
+    nombre_archivo = input("Ingrese el nombre del archivo YAML a importar: ")
+    app.importar_datos(nombre_archivo)
+
+def handle_export(app: SDNApplication) -> None:
+    nombre_archivo = input("Ingrese el nombre del archivo YAML a exportar: ")
+    app.exportar_datos(nombre_archivo)
+
+def handle_cursos(app: SDNApplication) -> None:
+    run_submenu(app, menu_cursos, ACCIONES_CURSOS)
+
+def handle_alumnos(app: SDNApplication) -> None:
+    run_submenu(app, menu_alumnos, ACCIONES_ALUMNOS)
+
+def handle_servidores(app: SDNApplication) -> None:
+    run_submenu(app, menu_servidores, ACCIONES_SERVIDORES)
+
+def handle_politicas(app: SDNApplication) -> None:
+    print("\nCursos que tienen acceso a SSH en el Servidor 1:")
+    for curso in app.cursos_con_acceso("Servidor 1", "ssh"):
+        print(f" - {curso.codigo}: {curso.nombre}")
+
+def handle_conexiones(app: SDNApplication) -> None:
+    run_submenu(app, menu_conexiones, ACCIONES_CONEXIONES)
+
+def handle_salir(app: SDNApplication) -> None:
+    print("Saliendo del sistema...")
+    raise SystemExit
+
+def handle_invalid(app: SDNApplication) -> None:
+    print("Opción no válida.")
+
+DISPATCH = {
+    "1": handle_import,
+    "2": handle_export,
+    "3": handle_cursos,
+    "4": handle_alumnos,
+    "5": handle_servidores,
+    "6": handle_politicas,
+    "7": handle_conexiones,
+    "0": handle_salir,
+}
 
 
 if __name__ == "__main__":
@@ -604,207 +1154,4 @@ if __name__ == "__main__":
     while True:
         menu_principal()
         opcion = input("Seleccione una opción: ")
-
-        if opcion == "1":
-            nombre_archivo = input("Ingrese el nombre del archivo YAML a importar: ")
-            app.importar_datos(nombre_archivo)
-
-        elif opcion == "2":
-            nombre_archivo = input("Ingrese el nombre del archivo YAML a exportar: ")
-            app.exportar_datos(nombre_archivo)
-
-        elif opcion == "3":
-            while True:
-                menu_cursos()
-                subop = input("Seleccione una opción: ")
-
-                if subop == "1":
-                    codigo = input("Código del curso: ")
-                    nombre = input("Nombre del curso: ")
-                    estado = input("Estado (DICTANDO o INACTIVO): ")
-                    if codigo in app.cursos:
-                        print("⚠️ Ya existe un curso con ese código.")
-                    else:
-                        nuevo = Curso(codigo, nombre, estado)
-                        app.cursos[codigo] = nuevo
-                        print(f"Curso {nombre} agregado con éxito.")
-
-                elif subop == "2":
-                    print("\nLista de cursos:")
-                    for curso in app.cursos.values():
-                        print(f" - {curso}")
-
-                elif subop == "3":
-                    codigo = input("Ingrese el código del curso: ")
-                    if codigo in app.cursos:
-                        curso = app.cursos[codigo]
-                        print(curso)
-                        print("Alumnos:")
-                        for cod in curso.alumnos:
-                            alumno = app.alumnos.get(cod)
-                            if alumno:
-                                print(f" - {alumno}")
-                            else:
-                                print(f" - Código {cod} (no encontrado)")
-                        print("Servidores permitidos:")
-                        for srv in curso.servidores:
-                            print(f" - {srv.nombre}: {', '.join(srv.servicios_permitidos)}")
-                    else:
-                        print("❌ Curso no encontrado.")
-                                
-                elif subop == "4":
-                    codigo = input("Código del curso a actualizar: ")
-                    if codigo not in app.cursos:
-                        print("❌ Curso no encontrado.")
-                        continue
-                    curso = app.cursos[codigo]
-
-                    print("\nOpciones:")
-                    print("1) Agregar alumno al curso")
-                    print("2) Eliminar alumno del curso")
-                    print("0) Cancelar")
-                    accion = input("Seleccione una opción: ")
-
-                    if accion == "1":
-                        codigo_alumno = input("Código del alumno a agregar: ")
-                        if codigo_alumno in app.alumnos:
-                            curso.agregar_alumno(codigo_alumno)
-                            print(f"Alumno {codigo_alumno} agregado al curso {codigo}.")
-                        else:
-                            print("❌ Alumno no encontrado.")
-
-                    elif accion == "2":
-                        codigo_alumno = input("Código del alumno a eliminar: ")
-                        curso.remover_alumno(codigo_alumno)
-                        print(f"Alumno {codigo_alumno} eliminado del curso {codigo}.")
-
-                    elif accion == "0":
-                        print("Acción cancelada.")
-                    else:
-                        print("Opción inválida.")
-        
-
-                elif subop == "0":
-                    break
-
-                else:
-                    print("Opción inválida.")
-
-        elif opcion == "4":
-            while True:
-                menu_alumnos()
-                subop = input("Seleccione una opción: ")
-                
-                if subop == "1":
-                    nombre = input("Nombre del alumno: ")
-                    codigo = input("Código PUCP: ")
-                    mac = input("Dirección MAC (ej. 00:11:22:33:44:55): ")
-                    if codigo in app.alumnos:
-                        print("⚠️ Ya existe un alumno con ese código.")
-                    else:
-                        nuevo = Alumno(nombre, codigo, mac)
-                        app.alumnos[codigo] = nuevo
-                        print(f"Alumno {nombre} agregado con éxito.")
-                
-                elif subop == "2":
-                    print("\nLista de alumnos:")
-                    for alumno in app.alumnos.values():
-                        print(f" - {alumno}")
-                
-                elif subop == "3":
-                    codigo = input("Ingrese el código del alumno: ")
-                    if codigo in app.alumnos:
-                        print(app.alumnos[codigo])
-                    else:
-                        print("❌ Alumno no encontrado.")
-                
-                elif subop == "0":
-                    break
-                
-                else:
-                    print("Opción inválida.")
-        
-        elif opcion == "5":
-            while True:
-                menu_servidores()
-                subop = input("Seleccione una opción: ")
-
-                if subop == "1":
-                    nombre = input("Nombre del servidor: ")
-                    ip = input("Dirección IP: ")
-                    if nombre in app.servidores:
-                        print("⚠️ Ya existe un servidor con ese nombre.")
-                    else:
-                        nuevo = Servidor(nombre, ip)
-                        app.servidores[nombre] = nuevo
-                        print(f"Servidor {nombre} agregado con éxito.")
-                
-                elif subop == "2":
-                    print("\nLista de servidores:")
-                    for servidor in app.servidores.values():
-                        print(f" - {servidor}")
-                
-                elif subop == "3":
-                    nombre = input("Nombre del servidor: ")
-                    if nombre in app.servidores:
-                        srv = app.servidores[nombre]
-                        print(f"{srv}")
-                        print("Servicios:")
-                        for s in srv.servicios:
-                            print(f" - {s}")
-                    else:
-                        print("❌ Servidor no encontrado.")
-                
-                elif subop == "0":
-                    break
-                
-                else:
-                    print("Opción inválida.")
-
-        elif opcion == "6":
-            print("\nCursos que tienen acceso a SSH en el Servidor 1:")
-            for curso in app.cursos.values():
-                if curso.estado == "DICTANDO":
-                    for servidor in curso.servidores:
-                        if servidor.nombre == "Servidor 1" and "ssh" in servidor.servicios_permitidos:
-                            print(f" - {curso.codigo}: {curso.nombre}")
-
-        elif opcion == "7":
-            while True:
-                print("\n--- GESTIÓN DE CONEXIONES ---")
-                print("1) Crear conexión")
-                print("2) Listar conexiones")
-                print("3) Eliminar conexión")
-                print("0) Volver")
-                subop = input("Seleccione una opción: ")
-
-                if subop == "1":
-                    cod_alumno = input("Código del alumno: ")
-                    nombre_srv = input("Nombre del servidor: ")
-                    nombre_srv = nombre_srv.strip()
-                    nombre_servicio = input("Nombre del servicio (ej. ssh): ")
-                    nombre_servicio = nombre_servicio.strip()
-
-                    app.crear_conexion(cod_alumno, nombre_srv, nombre_servicio)
-
-                elif subop == "2":
-                    for conn in app.conexiones.values():
-                        print(conn)
-
-                elif subop == "3":
-                    handler = input("Ingrese el handler de la conexión a eliminar: ")
-                    app.eliminar_conexion(handler)
-
-                elif subop == "0":
-                    break
-
-                else:
-                    print("Opción inválida.")
-
-
-        elif opcion == "0":
-            print("Saliendo del sistema...")
-            break
-
-        else:
-            print("Opción no válida.")
+        DISPATCH.get(opcion, handle_invalid)(app)